@@ -1,74 +1,140 @@
 from __future__ import annotations
 
+import copy
+import functools
+import hashlib
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
-
-try:
-    import yaml  # type: ignore
-except Exception:  # pragma: no cover - yaml optional
-    yaml = None
+from typing import Any, Dict, List, Optional, Tuple
 
 CONFIG_DIR = Path.home() / ".config" / "systemd-tray"
 CONFIG_PATH = CONFIG_DIR / "services.yaml"
+# JSON copy of the parsed YAML, tagged with the YAML's (st_mtime_ns, st_size)
+CONFIG_CACHE_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "systemd-tray" / "services.json"
+)
 
-DEFAULT_CONFIG = {
-    "services": [
-        {
-            "name": "ComfyUI",
-            "unit": "comfyui.service",
-            "logs": {
-                "follow": True,
-                "lines": 200,
-            },
-        }
-    ]
-}
+TRUTHY_VALUES = frozenset(("true", "1", "yes", "on"))
 
-def ensure_config() -> Dict:
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    if not CONFIG_PATH.exists():
-        if yaml is None:
-            CONFIG_PATH.write_text("""services:
+# indent, list dash, key and value of the lines the fallback parser cares
+# about; the lookahead keeps every other line inside the regex engine
+_FALLBACK_RE = re.compile(
+    r"^([ \t]*)(?=-(?:[ \t]|$)|(?:name|unit|lines|follow):)"
+    r"(?:(-)[ \t]*)?(?:(name|unit|lines|follow):[ \t]*(.*?)[ \t]*$)?",
+    re.M,
+)
+
+# (st_mtime_ns, st_size) of CONFIG_PATH -> parsed config
+_CACHE: Optional[Tuple[Tuple[int, int], Dict]] = None
+# (st_mtime_ns, st_size) right after the last save -> digest of its bytes
+_LAST_SAVED: Optional[Tuple[Tuple[int, int], bytes]] = None
+
+@functools.lru_cache(maxsize=None)
+def _yaml_backend() -> Optional[Tuple[Any, Any, Any]]:
+    """(yaml, loader, dumper), imported on first use; None without PyYAML."""
+    try:
+        import yaml  # type: ignore
+    except Exception:  # pragma: no cover - yaml optional
+        return None
+    try:
+        from yaml import CSafeDumper as dumper, CSafeLoader as loader
+    except ImportError:  # pragma: no cover - libyaml not compiled in
+        from yaml import SafeDumper as dumper, SafeLoader as loader
+    return yaml, loader, dumper
+
+_DEFAULT_YAML_BYTES = b"""services:
   - name: ComfyUI
     unit: comfyui.service
     logs:
       follow: true
       lines: 200
-""", encoding="utf-8")
-        else:
-            CONFIG_PATH.write_text(
-                yaml.safe_dump(DEFAULT_CONFIG, sort_keys=False),
-                encoding="utf-8",
-            )
-    if yaml is None:
+"""
+
+def ensure_config() -> Dict:
+    global _CACHE
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    if not CONFIG_PATH.exists():
+        CONFIG_PATH.write_bytes(_DEFAULT_YAML_BYTES)
+    st = CONFIG_PATH.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    if _CACHE is not None and _CACHE[0] == key:
+        return copy.deepcopy(_CACHE[1])
+    config = _load_sidecar(key)
+    if config is None:
+        config = _load_config()
+        if _yaml_backend() is not None:
+            _write_sidecar(key, config)
+    _CACHE = (key, config)
+    return copy.deepcopy(config)
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _load_sidecar(key: Tuple[int, int]) -> Optional[Dict]:
+    try:
+        cached = json.loads(CONFIG_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return None
+    # only an exact match counts; restored backups keep older mtimes
+    if not isinstance(cached, dict) or cached.get("source") != list(key):
+        return None
+    config = cached.get("config")
+    return config if isinstance(config, dict) else None
+
+def _write_sidecar(key: Tuple[int, int], config: Dict) -> None:
+    try:
+        CONFIG_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({"source": list(key), "config": config})
+        _write_atomic(CONFIG_CACHE_PATH, payload.encode("utf-8"))
+    except (OSError, TypeError, ValueError):
+        # not fatal: the YAML stays authoritative
+        pass
+
+def _load_config() -> Dict:
+    backend = _yaml_backend()
+    if backend is None:
         services: List[Dict] = []
         name = unit = None
         lines = 200
         follow = True
-        with CONFIG_PATH.open("r", encoding="utf-8") as fh:
-            for line in fh:
-                s = line.strip()
-                if s.startswith("- "):
-                    if name and unit:
-                        services.append({
-                            "name": name,
-                            "unit": unit,
-                            "logs": {"follow": follow, "lines": lines},
-                        })
-                    name = unit = None
+        item_indent: Optional[str] = None
+        text = CONFIG_PATH.read_text(encoding="utf-8")
+        for match in _FALLBACK_RE.finditer(text):
+            indent, dash, key, value = match.groups()
+            if dash:
+                if item_indent is None:
+                    item_indent = indent
+                if indent != item_indent:
+                    # nested list entry (e.g. under "open:")
+                    continue
+                if name and unit:
+                    services.append({
+                        "name": name,
+                        "unit": unit,
+                        "logs": {"follow": follow, "lines": lines},
+                    })
+                name = unit = None
+                lines = 200
+                follow = True
+            if key == "name":
+                name = value
+            elif key == "unit":
+                unit = value
+            elif key == "lines":
+                try:
+                    lines = int(value)
+                except Exception:
                     lines = 200
-                    follow = True
-                elif s.startswith("name:"):
-                    name = s.split(":", 1)[1].strip()
-                elif s.startswith("unit:"):
-                    unit = s.split(":", 1)[1].strip()
-                elif s.startswith("lines:"):
-                    try:
-                        lines = int(s.split(":", 1)[1].strip())
-                    except Exception:
-                        lines = 200
-                elif s.startswith("follow:"):
-                    follow = s.split(":", 1)[1].strip().lower() in {"true", "1", "yes", "on"}
+            elif key == "follow":
+                follow = value.lower() in TRUTHY_VALUES
         if name and unit:
             services.append({
                 "name": name,
@@ -76,34 +142,120 @@ def ensure_config() -> Dict:
                 "logs": {"follow": follow, "lines": lines},
             })
         return {"services": services}
-    return yaml.safe_load(CONFIG_PATH.read_text(encoding="utf-8")) or {"services": []}
+    yaml, loader, _ = backend
+    with CONFIG_PATH.open("r", encoding="utf-8") as fh:
+        return yaml.load(fh, Loader=loader) or {"services": []}
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    # replace the file a symlink points at, not the link itself
+    path = path.resolve()
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        # what a plain open() would have created
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=path.suffix)
+    try:
+        # mkstemp creates the file 0600
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(payload)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
 
 def save_config(config: Dict) -> None:
+    global _CACHE, _LAST_SAVED
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     data = {"services": config.get("services", [])}
-    if yaml is None:
-        lines = ["services:"]
+    backend = _yaml_backend()
+    if backend is None:
+        buf = bytearray(b"services:\n")
         for svc in data["services"]:
-            lines.append(f"  - unit: {svc.get('unit', '')}")
+            buf += f"  - unit: {svc.get('unit', '')}\n".encode()
             name = svc.get("name")
             if name:
-                lines.append(f"    name: {name}")
+                buf += f"    name: {name}\n".encode()
             logs = svc.get("logs", {}) or {}
             if logs:
-                lines.append("    logs:")
+                buf += b"    logs:\n"
                 follow = logs.get("follow")
                 if follow is not None:
-                    lines.append(f"      follow: {'true' if follow else 'false'}")
+                    buf += b"      follow: true\n" if follow else b"      follow: false\n"
                 lines_val = logs.get("lines")
                 if lines_val is not None:
-                    lines.append(f"      lines: {lines_val}")
-        CONFIG_PATH.write_text("\n".join(lines) + "\n", encoding="utf-8")
+                    buf += f"      lines: {lines_val}\n".encode()
+        payload = bytes(buf)
     else:
-        CONFIG_PATH.write_text(
-            yaml.safe_dump(data, sort_keys=False),
-            encoding="utf-8",
+        yaml, _, dumper = backend
+        payload = yaml.dump(data, Dumper=dumper, sort_keys=False, encoding="utf-8")
+
+    digest = hashlib.blake2b(payload, digest_size=8).digest()
+    current = _stat_key(CONFIG_PATH)
+    if _LAST_SAVED is not None and _LAST_SAVED[0] == current:
+        if _LAST_SAVED[1] == digest:
+            # same bytes as our last write and nobody touched the file since
+            return
+    elif current is not None and current[1] == len(payload):
+        # not written by us (yet); a same-sized file may still be identical
+        try:
+            unchanged = CONFIG_PATH.read_bytes() == payload
+        except OSError:
+            unchanged = False
+        if unchanged:
+            _LAST_SAVED = (current, digest)
+            return
+
+    _CACHE = None
+    _write_atomic(CONFIG_PATH, payload)
+    key = _stat_key(CONFIG_PATH)
+    _LAST_SAVED = (key, digest) if key is not None else None
+    if backend is not None and key is not None:
+        # a YAML round trip yields the same dict, so seed the caches with it;
+        # the fallback writer drops keys and has to be re-read instead
+        _CACHE = (key, copy.deepcopy(data))
+        _write_sidecar(key, data)
+
+@dataclass(frozen=True)
+class Service:
+    """A configured service as the UI consumes it, parsed once per load."""
+
+    # open_actions holds dicts
+    __hash__ = None  # type: ignore[assignment]
+
+    unit: str
+    name: str
+    lines: int = 200
+    follow: bool = True
+    open_actions: Tuple[Dict[str, str], ...] = ()
+
+    @classmethod
+    def from_dict(cls, service: Dict) -> "Service":
+        unit = service.get("unit") or ""
+        logs = service.get("logs") or {}
+        try:
+            lines = int(logs.get("lines", 200))
+        except Exception:
+            lines = 200
+        return cls(
+            unit=unit,
+            name=service.get("name") or unit,
+            lines=lines,
+            follow=bool(logs.get("follow", True)),
+            open_actions=tuple(parse_open_actions(service)),
         )
 
+def load_services(config: Dict) -> List[Service]:
+    return [Service.from_dict(svc) for svc in config.get("services", []) if svc.get("unit")]
+
 def parse_open_actions(service: Dict) -> List[Dict[str, str]]:
     raw = service.get("open")
     if not raw:
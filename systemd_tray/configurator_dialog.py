@@ -1,12 +1,12 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Dict, List, TYPE_CHECKING
+from bisect import bisect_right
+from typing import Dict, List, Optional, TYPE_CHECKING
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
-from .icon_utils import create_svg_icon, icon_has_pixmaps
+from .config import TRUTHY_VALUES
 from .systemd_backend import ServiceCandidate
 
 if TYPE_CHECKING:
@@ -18,18 +18,7 @@ class ConfiguratorDialog(QtWidgets.QDialog):
         self.tray = tray
         self.setWindowTitle("Manage Services")
 
-        icon = tray.icon()
-        if not icon_has_pixmaps(icon):
-            icon = QtGui.QIcon.fromTheme("systemd-tray")
-        if not icon_has_pixmaps(icon):
-            icon = QtGui.QIcon.fromTheme("systemd-tray-symbolic")
-        if not icon_has_pixmaps(icon):
-            icons_dir = Path(__file__).resolve().parent.parent / "icons"
-            icon = create_svg_icon(icons_dir / "systemd-tray-dark.svg")
-        if not icon_has_pixmaps(icon):
-            icon = QtWidgets.QApplication.style().standardIcon(QtWidgets.QStyle.SP_ComputerIcon)
-        if icon_has_pixmaps(icon):
-            self.setWindowIcon(icon)
+        self.setWindowIcon(tray.dialog_icon)
         self.resize(520, 560)
 
         layout = QtWidgets.QVBoxLayout(self)
@@ -59,13 +48,26 @@ class ConfiguratorDialog(QtWidgets.QDialog):
         buttons.accepted.connect(self.accept)
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
+        self.ok_button = buttons.button(QtWidgets.QDialogButtonBox.Ok)
 
         self.current_config = config
+        self._candidates: Optional[List[ServiceCandidate]] = None
+        # lowered display texts of the list rows, NUL-joined in row order,
+        # plus each row's start offset; filtering is a few str.find calls
+        self._haystack = ""
+        self._haystack_offsets: List[int] = []
         self.unit_to_config = {svc.get("unit"): svc for svc in self.current_config.get("services", []) if svc.get("unit")}
 
-        self.search_edit.textChanged.connect(self._apply_filter)
+        self._filter_timer = QtCore.QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(120)
+        self._filter_timer.timeout.connect(lambda: self._apply_filter(self.search_edit.text()))
+
+        self.search_edit.textChanged.connect(self._on_search_text_changed)
         self.show_hidden_box.toggled.connect(self._on_show_hidden_toggled)
-        self._populate_list(force_refresh=True)
+        self.tray.backend.servicesListed.connect(self._on_services_listed)
+        # the backend keeps its list while the unit directories are unchanged
+        self._load_candidates()
 
     def _display_text(self, candidate: ServiceCandidate) -> str:
         parts = [candidate.unit]
@@ -73,35 +75,62 @@ class ConfiguratorDialog(QtWidgets.QDialog):
             parts.append(f"— {candidate.description}")
         return " ".join(parts)
 
-    def _populate_list(self, force_refresh: bool = False) -> None:
+    def _load_candidates(self, force_refresh: bool = False) -> None:
+        self.list_widget.clear()
+        self._haystack = ""
+        self._haystack_offsets = []
+        placeholder = QtWidgets.QListWidgetItem("Loading services…")
+        placeholder.setFlags(QtCore.Qt.NoItemFlags)
+        self.list_widget.addItem(placeholder)
+        # accepting now would save an empty selection over the config
+        self.ok_button.setEnabled(False)
+        self.status_label.setText("Querying systemd for user services…")
+        self.tray.backend.request_services(
+            include_hidden=True,
+            required_units=set(self.unit_to_config.keys()),
+            force_refresh=force_refresh,
+        )
+
+    def _on_services_listed(self, services: List[ServiceCandidate]) -> None:
+        self._candidates = services
+        self._populate_list()
+        self.ok_button.setEnabled(True)
+
+    def _populate_list(self) -> None:
+        if self._candidates is None:
+            return
         current_states: Dict[str, QtCore.Qt.CheckState] = {}
         for i in range(self.list_widget.count()):
             item = self.list_widget.item(i)
-            candidate: ServiceCandidate = item.data(QtCore.Qt.UserRole)
-            current_states[candidate.unit] = item.checkState()
+            candidate: Optional[ServiceCandidate] = item.data(QtCore.Qt.UserRole)
+            if candidate is not None:
+                current_states[candidate.unit] = item.checkState()
 
         self.list_widget.clear()
         existing_units = set(self.unit_to_config.keys())
         show_hidden = self.show_hidden_box.isChecked()
 
-        services = self.tray.backend.list_services(
-            include_hidden=True,
-            required_units=existing_units,
-            force_refresh=force_refresh,
-        )
         visible_candidates = [
-            c for c in services
+            c for c in self._candidates
             if show_hidden or not c.hidden or c.unit in existing_units or current_states.get(c.unit) == QtCore.Qt.Checked
         ]
 
-        for candidate in sorted(visible_candidates, key=lambda c: (c.description.lower() if c.description else c.unit.lower())):
-            item = QtWidgets.QListWidgetItem(self._display_text(candidate))
+        decorated = [((c.description or c.unit).lower(), c) for c in visible_candidates]
+        decorated.sort(key=lambda t: t[0])
+
+        lowered: List[str] = []
+        self.list_widget.setUpdatesEnabled(False)
+        self.list_widget.blockSignals(True)
+        for _, candidate in decorated:
+            display = self._display_text(candidate)
+            item = QtWidgets.QListWidgetItem(display)
             item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
             state = current_states.get(candidate.unit)
             if state is None:
                 state = QtCore.Qt.Checked if candidate.unit in existing_units else QtCore.Qt.Unchecked
             item.setCheckState(state)
             item.setData(QtCore.Qt.UserRole, candidate)
+            lowered.append(display.lower())
 
             tooltip_lines = [candidate.unit]
             if candidate.description:
@@ -114,6 +143,15 @@ class ConfiguratorDialog(QtWidgets.QDialog):
                 item.setForeground(QtGui.QColor("#6c757d"))
             item.setToolTip("\n".join(tooltip_lines))
             self.list_widget.addItem(item)
+        self.list_widget.blockSignals(False)
+        self.list_widget.setUpdatesEnabled(True)
+
+        self._haystack = "\0".join(lowered)
+        self._haystack_offsets = []
+        offset = 0
+        for entry in lowered:
+            self._haystack_offsets.append(offset)
+            offset += len(entry) + 1
 
         if not visible_candidates:
             self.status_label.setText("No manageable services were detected. Toggle ‘Show filtered units’ to include helper/autostart entries.")
@@ -123,16 +161,30 @@ class ConfiguratorDialog(QtWidgets.QDialog):
         self._apply_filter(self.search_edit.text())
 
     def _on_show_hidden_toggled(self, _: bool) -> None:
-        self._populate_list(force_refresh=True)
+        # only the visibility filter changed; reuse the fetched unit list
+        self._populate_list()
+
+    def _on_search_text_changed(self, _: str) -> None:
+        self._filter_timer.start()
 
     def _apply_filter(self, text: str) -> None:
         text = text.strip().lower()
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            candidate: ServiceCandidate = item.data(QtCore.Qt.UserRole)
-            display = self._display_text(candidate).lower()
-            matches = text in display if text else True
-            item.setHidden(not matches)
+        offsets = self._haystack_offsets
+        if not offsets:
+            return
+        if not text:
+            matched = range(len(offsets))
+        else:
+            matched = set()
+            pos = self._haystack.find(text)
+            while pos != -1:
+                row = bisect_right(offsets, pos) - 1
+                matched.add(row)
+                if row + 1 >= len(offsets):
+                    break
+                pos = self._haystack.find(text, offsets[row + 1])
+        for i in range(len(offsets)):
+            self.list_widget.item(i).setHidden(i not in matched)
 
     def selected_services(self) -> List[Dict]:
         selected: List[Dict] = []
@@ -140,13 +192,15 @@ class ConfiguratorDialog(QtWidgets.QDialog):
             item = self.list_widget.item(i)
             if item.checkState() != QtCore.Qt.Checked:
                 continue
-            candidate: ServiceCandidate = item.data(QtCore.Qt.UserRole)
+            candidate: Optional[ServiceCandidate] = item.data(QtCore.Qt.UserRole)
+            if candidate is None:
+                continue
             existing = self.unit_to_config.get(candidate.unit, {})
             name = existing.get("name") or (candidate.description or candidate.unit)
             logs_config = existing.get("logs") or {}
             follow_val = logs_config.get("follow", True)
             if isinstance(follow_val, str):
-                follow = follow_val.strip().lower() in {"true", "1", "yes", "on"}
+                follow = follow_val.strip().lower() in TRUTHY_VALUES
             else:
                 follow = bool(follow_val)
             lines_val = logs_config.get("lines", 200)
@@ -163,6 +217,13 @@ class ConfiguratorDialog(QtWidgets.QDialog):
             selected.append({**extras, "name": name, "unit": candidate.unit, "logs": logs})
         return selected
 
+    def done(self, result: int) -> None:
+        try:
+            self.tray.backend.servicesListed.disconnect(self._on_services_listed)
+        except (RuntimeError, TypeError):
+            pass
+        super().done(result)
+
     def on_reload_daemon(self) -> None:
         self.reload_button.setEnabled(False)
         self.reload_button.setText("Reloading…")
@@ -1,24 +1,61 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
-from PySide6 import QtCore, QtGui
+from PySide6 import QtCore, QtGui, QtWidgets
 
-try:
-    from PySide6.QtSvg import QSvgRenderer
-except Exception:  # pragma: no cover - optional component
-    QSvgRenderer = None
+ICONS_DIR = Path(__file__).resolve().parent.parent / "icons"
+ICON_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "systemd-tray" / "icons"
+ICON_SIZES = (16, 20, 24, 32, 48, 64, 96, 128)
+
+# (svg path, st_mtime_ns) -> rendered icon
+_ICON_CACHE: Dict[Tuple[str, int], QtGui.QIcon] = {}
+
+def _svg_plugin_available() -> bool:
+    formats = QtGui.QImageReader.supportedImageFormats()
+    return any(bytes(fmt).lower() == b"svg" for fmt in formats)
 
 def create_svg_icon(path: Path) -> Optional[QtGui.QIcon]:
-    if QSvgRenderer is None or not path.exists():
+    if not path.exists():
+        return None
+    key = (str(path), path.stat().st_mtime_ns)
+    cached = _ICON_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    if _svg_plugin_available():
+        # Qt's SVG plugin rasterizes on demand at whatever size is painted
+        icon = QtGui.QIcon()
+        icon.addFile(str(path))
+        _ICON_CACHE[key] = icon
+        return icon
+
+    png_paths = [ICON_CACHE_DIR / f"{path.stem}-{key[1]}-{size}.png" for size in ICON_SIZES]
+    if all(png.exists() for png in png_paths):
+        # rasters from an earlier run; loading PNGs is far cheaper than SVG
+        icon = QtGui.QIcon()
+        for png in png_paths:
+            icon.addFile(str(png))
+        _ICON_CACHE[key] = icon
+        return icon
+
+    try:
+        # QtSvg is only needed when neither the plugin nor cached PNGs exist
+        from PySide6.QtSvg import QSvgRenderer
+    except Exception:  # pragma: no cover - optional component
         return None
     renderer = QSvgRenderer(str(path))
     if not renderer.isValid():
         return None
 
+    try:
+        ICON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        pass
     icon = QtGui.QIcon()
-    for size in (16, 20, 24, 32, 48, 64, 96, 128):
+    for size, png in zip(ICON_SIZES, png_paths):
         pix = QtGui.QPixmap(size, size)
         pix.fill(QtCore.Qt.transparent)
         painter = QtGui.QPainter(pix)
@@ -27,6 +64,8 @@ def create_svg_icon(path: Path) -> Optional[QtGui.QIcon]:
         renderer.render(painter, QtCore.QRectF(0, 0, size, size))
         painter.end()
         icon.addPixmap(pix)
+        pix.save(str(png), "PNG")
+    _ICON_CACHE[key] = icon
     return icon
 
 def icon_has_pixmaps(icon: Optional[QtGui.QIcon]) -> bool:
@@ -36,3 +75,17 @@ def icon_has_pixmaps(icon: Optional[QtGui.QIcon]) -> bool:
         return True
     pix = icon.pixmap(16, 16)
     return not pix.isNull()
+
+def resolve_app_icon(app: QtWidgets.QApplication) -> QtGui.QIcon:
+    icon = QtGui.QIcon.fromTheme("systemd-tray")
+    if not icon_has_pixmaps(icon):
+        icon = QtGui.QIcon.fromTheme("systemd-tray-symbolic")
+
+    if not icon_has_pixmaps(icon):
+        window_color = app.palette().color(QtGui.QPalette.Window)
+        lightness = window_color.lightnessF()
+        fallback_name = "systemd-tray-dark.svg" if lightness < 0.45 else "systemd-tray-light.svg"
+        svg_icon = create_svg_icon(ICONS_DIR / fallback_name)
+        if svg_icon is not None:
+            icon = svg_icon
+    return icon
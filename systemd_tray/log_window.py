@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import codecs
+import os
+import signal
+import subprocess
+from typing import Optional
+
 from PySide6 import QtCore, QtGui, QtWidgets
 
 MAX_LOG_BLOCKS = 2000
+FLUSH_INTERVAL_MS = 50
+READ_BUFFER_SIZE = 65536
 
 class LogWindow(QtWidgets.QMainWindow):
     def __init__(self, unit: str, lines: int = 200, follow: bool = True):
@@ -12,23 +20,44 @@ class LogWindow(QtWidgets.QMainWindow):
         self.resize(900, 600)
         self.text = QtWidgets.QPlainTextEdit(self)
         self.text.setReadOnly(True)
+        self.text.setMaximumBlockCount(max(MAX_LOG_BLOCKS, (lines or 0) * 10))
         font = QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont)
         self.text.setFont(font)
         self.setCentralWidget(self.text)
 
-        self.proc = QtCore.QProcess(self)
-        args = ["--user", "-u", unit]
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = bytearray()
+        self._flush_timer = QtCore.QTimer(self)
+        self._flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush)
+
+        # one buffer reused for every read from the journalctl pipe
+        self._buf = bytearray(READ_BUFFER_SIZE)
+        self._view = memoryview(self._buf)
+        self._fd: Optional[int] = None
+        self._notifier: Optional[QtCore.QSocketNotifier] = None
+        self.proc: Optional[subprocess.Popen] = None
+
+        args = ["journalctl", "--user", "-u", unit]
         if lines:
             args.extend(["-n", str(lines)])
         args.extend(["-o", "short-iso"])
         if follow:
             args.append("-f")
-        self.proc.setProgram("journalctl")
-        self.proc.setArguments(args)
-        self.proc.setProcessChannelMode(QtCore.QProcess.MergedChannels)
-        self.proc.readyReadStandardOutput.connect(self.on_output)
-        self.proc.finished.connect(self.on_finished)
-        self.proc.start()
+        read_fd, write_fd = os.pipe2(os.O_CLOEXEC)
+        try:
+            self.proc = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=write_fd, stderr=subprocess.STDOUT)
+        except OSError as exc:
+            os.close(read_fd)
+            self.text.appendPlainText(f"[failed to start journalctl: {exc}]")
+        else:
+            os.set_blocking(read_fd, False)
+            self._fd = read_fd
+            self._notifier = QtCore.QSocketNotifier(read_fd, QtCore.QSocketNotifier.Read, self)
+            self._notifier.activated.connect(self.on_output)
+        finally:
+            os.close(write_fd)
 
         toolbar = QtWidgets.QToolBar()
         self.addToolBar(toolbar)
@@ -48,18 +77,47 @@ class LogWindow(QtWidgets.QMainWindow):
         self._paused = False
         self._stopped = False
 
-    def on_output(self):
+    def on_output(self, *_):
+        if self._fd is None:
+            return
+        try:
+            count = os.readv(self._fd, [self._view])
+        except BlockingIOError:
+            return
+        except OSError:
+            count = 0
+        if count == 0:
+            self._close_pipe()
+            if self.proc is not None:
+                try:
+                    self.proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    pass
+            self.on_finished()
+            return
         if self._paused or self._stopped:
-            self.proc.readAllStandardOutput()
+            self._decoder.reset()
             return
-        data = self.proc.readAllStandardOutput().data().decode(errors="replace")
+        self._pending += self._view[:count]
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self, final: bool = False) -> None:
+        self._flush_timer.stop()
+        if not self._pending and not final:
+            return
+        data = self._decoder.decode(self._pending, final=final)
+        self._pending.clear()
         if not data:
             return
-        self.text.appendPlainText(data)
-        self._trim_buffer()
-        self.text.verticalScrollBar().setValue(self.text.verticalScrollBar().maximum())
+        cursor = QtGui.QTextCursor(self.text.document())
+        cursor.movePosition(QtGui.QTextCursor.End)
+        cursor.insertText(data)
+        scrollbar = self.text.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
 
     def on_finished(self):
+        self._flush(final=not (self._paused or self._stopped))
         if not self._stopped:
             self.text.appendPlainText("\n[log stream ended]")
 
@@ -68,7 +126,11 @@ class LogWindow(QtWidgets.QMainWindow):
         self.text.copy()
 
     def toggle_pause(self, checked: bool):
+        self._flush()
         self._paused = checked
+        # freeze journalctl itself rather than reading and discarding output;
+        # on_output still drops whatever was already in the pipe
+        self._signal_proc(signal.SIGSTOP if checked else signal.SIGCONT)
         if checked:
             self.text.appendPlainText("\n[log stream paused]")
         else:
@@ -79,31 +141,47 @@ class LogWindow(QtWidgets.QMainWindow):
         if self._stopped:
             return
         self._stopped = True
-        if self.proc.state() == QtCore.QProcess.Running:
+        self._flush()
+        self._close_pipe()
+        if self.proc is not None and self.proc.poll() is None:
             self.proc.terminate()
-            if not self.proc.waitForFinished(2000):
+            self._signal_proc(signal.SIGCONT)
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
                 self.proc.kill()
+                self.proc.wait()
         self.text.appendPlainText("\n[log stream stopped]")
         self.act_pause.setChecked(False)
         self._paused = False
 
-    def _trim_buffer(self, max_blocks: int = MAX_LOG_BLOCKS) -> None:
-        doc = self.text.document()
-        if doc.blockCount() <= max_blocks:
+    def _signal_proc(self, signum: int) -> None:
+        if self.proc is None or self.proc.poll() is not None:
             return
-        cursor = QtGui.QTextCursor(doc)
-        cursor.beginEditBlock()
-        while doc.blockCount() > max_blocks:
-            cursor.setPosition(0)
-            cursor.movePosition(QtGui.QTextCursor.EndOfBlock, QtGui.QTextCursor.KeepAnchor)
-            cursor.removeSelectedText()
-            cursor.deleteChar()
-        cursor.endEditBlock()
+        try:
+            os.kill(self.proc.pid, signum)
+        except OSError:
+            pass
 
-    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+    def _close_pipe(self) -> None:
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier.deleteLater()
+            self._notifier = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def kill_process(self) -> None:
+        # SIGKILL also reaches a journalctl stopped by pause
         try:
-            if self.proc.state() == QtCore.QProcess.Running:
+            self._close_pipe()
+            if self.proc is not None and self.proc.poll() is None:
                 self.proc.kill()
+                self.proc.wait()
         except Exception:
             pass
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        self.kill_process()
         return super().closeEvent(event)
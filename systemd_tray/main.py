@@ -11,46 +11,77 @@ from __future__ import annotations
 
 import sys
 import time
-from pathlib import Path
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping
 
-from PySide6 import QtGui, QtWidgets
+from PySide6 import QtCore, QtGui, QtWidgets
 
-from .config import ensure_config, save_config
+from .config import Service, ensure_config, load_services, save_config
 from .configurator_dialog import ConfiguratorDialog
-from .icon_utils import create_svg_icon, icon_has_pixmaps
+from .icon_utils import icon_has_pixmaps, resolve_app_icon
 from .log_window import LogWindow
 from .services_panel import ServicesPanel
 from .systemd_backend import SystemdBackend
 
 APP_NAME = "Systemd Tray"
+BACKGROUND_REFRESH_MS = 30000
 
 class TrayApp(QtWidgets.QSystemTrayIcon):
     def __init__(self, icon: QtGui.QIcon, app: QtWidgets.QApplication, config: Dict):
         super().__init__(icon, app)
         self.app = app
         self.config = config
+        self.services: List[Service] = []
+        self.configured_units: FrozenSet[str] = frozenset()
+        self._load_services()
         self.setToolTip(APP_NAME)
 
+        # resolved once; the configurator reuses it on every open
+        self.dialog_icon = icon
+        if not icon_has_pixmaps(self.dialog_icon):
+            self.dialog_icon = app.style().standardIcon(QtWidgets.QStyle.SP_ComputerIcon)
+
+        style = app.style()
+        # standard-icon fallbacks shared by every ServiceRow
+        self.icons: Dict[str, QtGui.QIcon] = {
+            "log": style.standardIcon(QtWidgets.QStyle.SP_FileDialogInfoView),
+            "open": style.standardIcon(QtWidgets.QStyle.SP_DialogOpenButton),
+        }
+
         self.menu = QtWidgets.QMenu()
         self.setContextMenu(self.menu)
         self.log_windows: Dict[str, LogWindow] = {}
+        # Quit skips closeEvent; reap journalctl children, paused ones too
+        app.aboutToQuit.connect(self.on_about_to_quit)
         self.panel = ServicesPanel(self)
         self.config_dialog: ConfiguratorDialog | None = None
         self.backend = SystemdBackend(self)
         self.backend.statusFetched.connect(self.on_status_fetched)
         self.backend.commandFinished.connect(self.on_command_finished)
 
-        self.status_cache: Dict[str, tuple[float, str]] = {}
+        self.status_cache_ts: Dict[str, float] = {}
+        self.status_cache_val: Dict[str, str] = {}
         self.status_ttl = 3.0
         self.last_status: Dict[str, str] = {}
         self.suppressed_until: Dict[str, float] = {}
+        self._panel_ever_shown = False
+
+        # slow refresh for the tooltip and notifications while the panel is
+        # closed; unneeded when the backend gets state changes pushed
+        self.background_timer = QtCore.QTimer(self)
+        self.background_timer.setInterval(BACKGROUND_REFRESH_MS)
+        self.background_timer.timeout.connect(self.on_background_refresh)
+        self.backend.start_watching()
 
         self.reload_menu()
-        self.panel.set_services(self.config)
+        self.panel.set_services(self.services)
         self.activated.connect(self.on_activated)
         self.refresh_all_statuses()
 
+    def _load_services(self) -> None:
+        self.services = load_services(self.config)
+        self.configured_units = frozenset(svc.unit for svc in self.services)
+
     # UI wiring -------------------------------------------------------------
     def reload_menu(self) -> None:
         self.menu.clear()
@@ -62,34 +93,68 @@ class TrayApp(QtWidgets.QSystemTrayIcon):
 
     def on_activated(self, reason: QtWidgets.QSystemTrayIcon.ActivationReason) -> None:
         if reason == QtWidgets.QSystemTrayIcon.Trigger:
+            # the panel refresh on show issues the deferred initial queries
+            self._panel_ever_shown = True
+            if not self.background_timer.isActive():
+                self.background_timer.start()
             if self.panel.isVisible():
                 self.panel.hide()
             else:
                 self.panel.show_at(QtGui.QCursor.pos())
 
+    def on_about_to_quit(self) -> None:
+        for win in self.log_windows.values():
+            win.kill_process()
+
     def notify(self, title: str, msg: str) -> None:
         self.showMessage(title, msg, QtWidgets.QSystemTrayIcon.Information, 4000)
 
     # Status handling -------------------------------------------------------
     def query_status(self, unit: str) -> str:
-        entry = self.status_cache.get(unit)
-        if entry:
-            return entry[1]
-        return "unknown"
+        return self.status_cache_val.get(unit, "unknown")
+
+    def status_snapshot(self) -> Mapping[str, str]:
+        return MappingProxyType(self.status_cache_val)
+
+    def _status_is_fresh(self, unit: str) -> bool:
+        ts = self.status_cache_ts.get(unit)
+        return ts is not None and time.monotonic() - ts <= self.status_ttl
 
     def request_status_update(self, unit: str) -> None:
         if not unit:
             return
-        entry = self.status_cache.get(unit)
-        if entry and time.monotonic() - entry[0] <= self.status_ttl:
+        if self._status_is_fresh(unit):
             return
         self.backend.request_status(unit)
 
+    def _refresh_visible_panel(self) -> None:
+        # a hidden panel refreshes in show_at; refreshing now would query
+        # every unit even if the tray was never clicked
+        if self.panel.isVisible():
+            self.panel.refresh()
+
     def refresh_all_statuses(self) -> None:
-        for svc in self.config.get("services", []):
-            unit = svc.get("unit")
-            if unit:
-                self.request_status_update(unit)
+        if not self.services or not self._panel_ever_shown:
+            return
+        units = [svc.unit for svc in self.services]
+        self.request_status_updates(units)
+
+    def request_status_updates(self, units: List[str]) -> None:
+        stale = [unit for unit in units if not self._status_is_fresh(unit)]
+        self.backend.request_statuses(stale)
+
+    def on_background_refresh(self) -> None:
+        if self.backend.watching or self.panel.isVisible():
+            return
+        self.refresh_all_statuses()
+
+    def update_tooltip(self) -> None:
+        units = [svc.unit for svc in self.services]
+        if not units:
+            self.setToolTip(APP_NAME)
+            return
+        active = sum(1 for unit in units if self.last_status.get(unit) == "active")
+        self.setToolTip(f"{APP_NAME}: {active}/{len(units)} active")
 
     def handle_status_update(self, unit: str, status: str | None) -> None:
         normalized = (status or "unknown").strip().lower() or "unknown"
@@ -110,21 +175,27 @@ class TrayApp(QtWidgets.QSystemTrayIcon):
 
     def prune_state_cache(self) -> None:
         now = time.monotonic()
-        active_units = {svc.get("unit") for svc in self.config.get("services", []) if svc.get("unit")}
+        active_units = self.configured_units
         self.last_status = {k: v for k, v in self.last_status.items() if k in active_units}
-        self.status_cache = {
-            unit: (ts, status)
-            for unit, (ts, status) in self.status_cache.items()
-            if unit in active_units and now - ts <= self.status_ttl * 2
-        }
+        max_age = self.status_ttl * 2
+        stale = self.status_cache_ts.keys() - active_units
+        stale.update(unit for unit, ts in self.status_cache_ts.items() if now - ts > max_age)
+        for unit in stale:
+            self.status_cache_ts.pop(unit, None)
+            self.status_cache_val.pop(unit, None)
         self.suppressed_until = {k: v for k, v in self.suppressed_until.items() if k in active_units}
 
     # Backend callbacks -----------------------------------------------------
     def on_status_fetched(self, unit: str, status: str) -> None:
+        if unit not in self.configured_units:
+            # the D-Bus watcher reports every user unit, not only ours
+            return
         status = (status or "unknown").strip() or "unknown"
-        self.status_cache[unit] = (time.monotonic(), status)
+        self.status_cache_ts[unit] = time.monotonic()
+        self.status_cache_val[unit] = status
         self.handle_status_update(unit, status)
         self.panel.update_unit_status(unit, status)
+        self.update_tooltip()
 
     def on_command_finished(self, unit: str, action: str, success: bool, message: str) -> None:
         if success:
@@ -137,8 +208,9 @@ class TrayApp(QtWidgets.QSystemTrayIcon):
             elif action == "daemon-reload":
                 if self.config_dialog is not None:
                     self.config_dialog._reset_reload_button()
-            self.status_cache.pop(unit, None)
-            self.request_status_update(unit)
+            self.status_cache_ts.pop(unit, None)
+            self.status_cache_val.pop(unit, None)
+            self.backend.request_status(unit, force=True)
         else:
             detail = message or "Unknown error"
             if action == "daemon-reload":
@@ -193,9 +265,10 @@ class TrayApp(QtWidgets.QSystemTrayIcon):
             if dialog.exec() == QtWidgets.QDialog.Accepted:
                 services = dialog.selected_services()
                 self.config = {"services": services}
+                self._load_services()
                 save_config(self.config)
-                self.panel.set_services(self.config)
-                self.panel.refresh()
+                self.panel.set_services(self.services)
+                self._refresh_visible_panel()
                 self.prune_state_cache()
                 self.refresh_all_statuses()
         finally:
@@ -204,8 +277,9 @@ class TrayApp(QtWidgets.QSystemTrayIcon):
 
     def reload_config(self) -> None:
         self.config = ensure_config()
-        self.panel.set_services(self.config)
-        self.panel.refresh()
+        self._load_services()
+        self.panel.set_services(self.services)
+        self._refresh_visible_panel()
         self.prune_state_cache()
         self.refresh_all_statuses()
 
@@ -215,18 +289,7 @@ def main() -> None:
     app = QtWidgets.QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
 
-    icon = QtGui.QIcon.fromTheme("systemd-tray")
-    if not icon_has_pixmaps(icon):
-        icon = QtGui.QIcon.fromTheme("systemd-tray-symbolic")
-
-    if not icon_has_pixmaps(icon):
-        icons_dir = Path(__file__).resolve().parent.parent / "icons"
-        window_color = app.palette().color(QtGui.QPalette.Window)
-        lightness = window_color.lightnessF()
-        fallback_name = "systemd-tray-dark.svg" if lightness < 0.45 else "systemd-tray-light.svg"
-        svg_icon = create_svg_icon(icons_dir / fallback_name)
-        if svg_icon is not None:
-            icon = svg_icon
+    icon = resolve_app_icon(app)
 
     if icon_has_pixmaps(icon):
         app.setWindowIcon(icon)
@@ -1,104 +1,113 @@
-from typing import Dict, List, Optional
+import functools
+from typing import Dict, List, Optional, Tuple
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
-from systemd_tray.config import parse_open_actions
+from systemd_tray.config import Service
 
 
+_STATUS_COLORS: Dict[str, str] = {
+    "active": "#4caf50",
+    "activating": "#2196f3",
+    "reloading": "#2196f3",
+    "deactivating": "#ff9800",
+    "inactive": "#f44336",
+    "failed": "#f44336",
+}
+
 def status_indicator_color(status: Optional[str]) -> str:
-    normalized = (status or "").strip().lower()
-    mapping = {
-        "active": "#4caf50",
-        "activating": "#2196f3",
-        "reloading": "#2196f3",
-        "deactivating": "#ff9800",
-        "inactive": "#f44336",
-        "failed": "#f44336",
-    }
-    return mapping.get(normalized, "#9e9e9e")
-
-def indicator_pixmap(color: str, diameter: int = 12) -> QtGui.QPixmap:
-    pix = QtGui.QPixmap(diameter, diameter)
-    pix.fill(QtCore.Qt.transparent)
-    painter = QtGui.QPainter(pix)
-    painter.setRenderHint(QtGui.QPainter.Antialiasing)
-    painter.setBrush(QtGui.QColor(color))
-    painter.setPen(QtGui.QPen(QtGui.QColor(color)))
-    painter.drawEllipse(0, 0, diameter - 1, diameter - 1)
-    painter.end()
-    return pix
-
-def themed_icon(names: List[str], fallback: QtGui.QIcon) -> QtGui.QIcon:
+    # systemd already reports canonical lowercase states
+    color = _STATUS_COLORS.get(status)
+    if color is not None:
+        return color
+    return _STATUS_COLORS.get((status or "").strip().lower(), "#9e9e9e")
+
+@functools.lru_cache(maxsize=None)
+def indicator_style(color: str, diameter: int = 12) -> str:
+    # the label paints the dot itself, so no pixmap is ever allocated
+    return f"background-color: {color}; border-radius: {diameter // 2}px;"
+
+@functools.lru_cache(maxsize=None)
+def _theme_icon(names: Tuple[str, ...]) -> Optional[QtGui.QIcon]:
     for name in names:
         icon = QtGui.QIcon.fromTheme(name)
         if not icon.isNull():
             return icon
-    return fallback
-
-def _make_triangle_icon(color: QtGui.QColor) -> QtGui.QIcon:
-    pix = QtGui.QPixmap(18, 18)
-    pix.fill(QtCore.Qt.transparent)
-    painter = QtGui.QPainter(pix)
-    painter.setRenderHint(QtGui.QPainter.Antialiasing)
-    painter.setBrush(color)
-    painter.setPen(QtGui.QPen(color, 1))
-    points = [
-        QtCore.QPointF(5, 4),
-        QtCore.QPointF(14, 9),
-        QtCore.QPointF(5, 14),
-    ]
-    painter.drawPolygon(QtGui.QPolygonF(points))
-    painter.end()
-    return QtGui.QIcon(pix)
-
-def _make_stop_icon(color: QtGui.QColor) -> QtGui.QIcon:
-    pix = QtGui.QPixmap(18, 18)
-    pix.fill(QtCore.Qt.transparent)
-    painter = QtGui.QPainter(pix)
-    painter.setRenderHint(QtGui.QPainter.Antialiasing)
-    painter.setPen(QtCore.Qt.NoPen)
-    painter.setBrush(color)
-    painter.drawRoundedRect(QtCore.QRectF(5, 5, 8, 8), 2, 2)
-    painter.end()
-    return QtGui.QIcon(pix)
-
-def _make_log_icon(color: QtGui.QColor) -> QtGui.QIcon:
-    pix = QtGui.QPixmap(18, 18)
-    pix.fill(QtCore.Qt.transparent)
-    painter = QtGui.QPainter(pix)
-    painter.setRenderHint(QtGui.QPainter.Antialiasing)
-    pen = QtGui.QPen(color, 1.6)
-    painter.setPen(pen)
-    for i, y in enumerate((6, 9, 12)):
-        painter.drawLine(4, y, 14, y)
-    painter.end()
-    return QtGui.QIcon(pix)
-
-def _make_open_icon(color: QtGui.QColor) -> QtGui.QIcon:
-    pix = QtGui.QPixmap(18, 18)
-    pix.fill(QtCore.Qt.transparent)
-    painter = QtGui.QPainter(pix)
-    painter.setRenderHint(QtGui.QPainter.Antialiasing)
-    pen = QtGui.QPen(color, 1.6)
-    painter.setPen(pen)
-    painter.drawRect(4, 6, 7, 7)
-    painter.drawLine(9, 9, 14, 4)
-    painter.drawLine(11, 4, 14, 4)
-    painter.drawLine(14, 4, 14, 7)
-    painter.end()
-    return QtGui.QIcon(pix)
+    return None
+
+def themed_icon(names: Tuple[str, ...], fallback: QtGui.QIcon) -> QtGui.QIcon:
+    # theme lookups hit the icon engine; every row asks for the same names
+    icon = _theme_icon(tuple(names))
+    return fallback if icon is None else icon
+
+class _IconFactory:
+    """Paints the row button icons for one color, sharing its brush and pens."""
+
+    def __init__(self, color: QtGui.QColor):
+        self._brush = QtGui.QBrush(color)
+        self._pen_thin = QtGui.QPen(color, 1)
+        self._pen_bold = QtGui.QPen(color, 1.6)
+
+    def _begin(self) -> Tuple[QtGui.QPixmap, QtGui.QPainter]:
+        pix = QtGui.QPixmap(18, 18)
+        pix.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(pix)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        return pix, painter
+
+    def make_triangle_icon(self) -> QtGui.QIcon:
+        pix, painter = self._begin()
+        painter.setBrush(self._brush)
+        painter.setPen(self._pen_thin)
+        points = [
+            QtCore.QPointF(5, 4),
+            QtCore.QPointF(14, 9),
+            QtCore.QPointF(5, 14),
+        ]
+        painter.drawPolygon(QtGui.QPolygonF(points))
+        painter.end()
+        return QtGui.QIcon(pix)
+
+    def make_stop_icon(self) -> QtGui.QIcon:
+        pix, painter = self._begin()
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(self._brush)
+        painter.drawRoundedRect(QtCore.QRectF(5, 5, 8, 8), 2, 2)
+        painter.end()
+        return QtGui.QIcon(pix)
+
+    def make_log_icon(self) -> QtGui.QIcon:
+        pix, painter = self._begin()
+        painter.setPen(self._pen_bold)
+        for y in (6, 9, 12):
+            painter.drawLine(4, y, 14, y)
+        painter.end()
+        return QtGui.QIcon(pix)
+
+    def make_open_icon(self) -> QtGui.QIcon:
+        pix, painter = self._begin()
+        painter.setPen(self._pen_bold)
+        painter.drawRect(4, 6, 7, 7)
+        painter.drawLine(9, 9, 14, 4)
+        painter.drawLine(11, 4, 14, 4)
+        painter.drawLine(14, 4, 14, 7)
+        painter.end()
+        return QtGui.QIcon(pix)
 
 class ServiceRow(QtWidgets.QWidget):
-    def __init__(self, panel: "ServicesPanel", service: Dict):
+    def __init__(self, panel: "ServicesPanel", service: Service):
         super().__init__(panel)
         self.panel = panel
         self.tray = panel.tray
-        self.service: Dict = {}
+        self.service: Optional[Service] = None
         self.unit: str = ""
         self.lines: int = 200
         self.follow: bool = True
-        self.status: str = "unknown"
-        self.open_actions: List[Dict[str, str]] = []
+        # empty until the first update_status so that one always applies
+        self.status: str = ""
+        self.open_actions: Tuple[Dict[str, str], ...] = ()
+        # actions the open button/menu was last built from
+        self._built_open_actions: Optional[Tuple[Dict[str, str], ...]] = None
 
         layout = QtWidgets.QHBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -120,8 +129,7 @@ class ServiceRow(QtWidgets.QWidget):
 
         self.log_button = QtWidgets.QToolButton()
         self.log_button.setAutoRaise(True)
-        log_fallback = self.style().standardIcon(QtWidgets.QStyle.SP_FileDialogInfoView)
-        self.log_button.setIcon(themed_icon(["utilities-log-viewer", "view-list-text"], log_fallback))
+        self.log_button.setIcon(themed_icon(("utilities-log-viewer", "view-list-text"), self.tray.icons["log"]))
         self.log_button.setToolTip("Show journal logs")
         self.log_button.clicked.connect(self.on_logs)
         self.log_button.setIconSize(QtCore.QSize(16, 16))
@@ -129,39 +137,39 @@ class ServiceRow(QtWidgets.QWidget):
 
         self.open_button = QtWidgets.QToolButton()
         self.open_button.setAutoRaise(True)
-        open_fallback = self.style().standardIcon(QtWidgets.QStyle.SP_DialogOpenButton)
-        self.open_button.setIcon(themed_icon(["document-open", "system-run"], open_fallback))
+        self.open_button.setIcon(themed_icon(("document-open", "system-run"), self.tray.icons["open"]))
         self.open_button.setToolTip("Open…")
         self.open_button.setIconSize(QtCore.QSize(16, 16))
         self.open_button.clicked.connect(self.on_open_clicked)
         layout.addWidget(self.open_button)
-        self.open_menu = QtWidgets.QMenu(self)
+        # only rows with several open actions ever need a menu
+        self.open_menu: Optional[QtWidgets.QMenu] = None
         self.open_button.hide()
 
         self.update_config(service)
         self.update_status("unknown")
         self._refresh_button_icons()
 
-    def update_config(self, service: Dict) -> None:
+    def update_config(self, service: Service) -> None:
         self.service = service
-        self.unit = service.get("unit", self.unit)
-        self.name_label.setText(service.get("name") or self.unit)
-
-        logs = service.get("logs", {})
-        try:
-            self.lines = int(logs.get("lines", self.lines))
-        except Exception:
-            self.lines = 200
-        self.follow = bool(logs.get("follow", self.follow))
-
-        self.open_actions = parse_open_actions(service)
+        self.unit = service.unit
+        self.name_label.setText(service.name)
+        self.lines = service.lines
+        self.follow = service.follow
+        self.open_actions = service.open_actions
         self._refresh_open_button()
         self._refresh_button_icons()
 
     def update_status(self, status: Optional[str]) -> None:
-        self.status = (status or "unknown").strip().lower() or "unknown"
+        if status in _STATUS_COLORS or status == "unknown":
+            normalized = status
+        else:
+            normalized = (status or "unknown").strip().lower() or "unknown"
+        if normalized == self.status:
+            return
+        self.status = normalized
         color = status_indicator_color(self.status)
-        self.indicator.setPixmap(indicator_pixmap(color))
+        self.indicator.setStyleSheet(indicator_style(color))
 
         self._set_action_button_icon()
 
@@ -185,7 +193,8 @@ class ServiceRow(QtWidgets.QWidget):
         if len(self.open_actions) == 1:
             self.trigger_open(self.open_actions[0])
 
-    def trigger_open(self, action: Dict[str, str]) -> None:
+    def trigger_open(self, action: Dict[str, str], checked: bool = False) -> None:
+        # checked absorbs QAction.triggered's argument when bound via partial
         if "url" in action:
             QtGui.QDesktopServices.openUrl(QtCore.QUrl(action["url"]))
         elif "command" in action:
@@ -196,7 +205,11 @@ class ServiceRow(QtWidgets.QWidget):
                 QtCore.QProcess.startDetached(cmd)
 
     def _refresh_open_button(self) -> None:
-        self.open_menu.clear()
+        if self.open_actions == self._built_open_actions:
+            return
+        self._built_open_actions = self.open_actions
+        if self.open_menu is not None:
+            self.open_menu.clear()
         if not self.open_actions:
             self.open_button.hide()
             self.open_button.setMenu(None)
@@ -206,9 +219,11 @@ class ServiceRow(QtWidgets.QWidget):
             self.open_button.setPopupMode(QtWidgets.QToolButton.DelayedPopup)
             self.open_button.setMenu(None)
         else:
+            if self.open_menu is None:
+                self.open_menu = QtWidgets.QMenu(self)
             for action in self.open_actions:
                 act = self.open_menu.addAction(action.get("label", "Open"))
-                act.triggered.connect(lambda checked=False, a=action: self.trigger_open(a))
+                act.triggered.connect(functools.partial(self.trigger_open, action))
             self.open_button.setMenu(self.open_menu)
             self.open_button.setPopupMode(QtWidgets.QToolButton.InstantPopup)
 
@@ -218,10 +233,7 @@ class ServiceRow(QtWidgets.QWidget):
         if color == palette.color(QtGui.QPalette.WindowText):
             # if button text color equals window text, ensure contrast
             color = palette.color(QtGui.QPalette.HighlightedText)
-        self._icon_play = _make_triangle_icon(color)
-        self._icon_stop = _make_stop_icon(color)
-        self._icon_log = _make_log_icon(color)
-        self._icon_open = _make_open_icon(color)
+        self._icon_play, self._icon_stop, self._icon_log, self._icon_open = self.panel._get_button_icons(color)
 
         self.log_button.setIcon(self._icon_log)
         if self.open_actions:
@@ -272,37 +284,59 @@ class ServicesPanel(QtWidgets.QFrame):
         self.list_layout.addWidget(self.empty_label)
 
         self.rows: Dict[str, ServiceRow] = {}
+        # color.rgba() -> (play, stop, log, open) icons shared by all rows
+        self._button_icons: Dict[int, Tuple[QtGui.QIcon, QtGui.QIcon, QtGui.QIcon, QtGui.QIcon]] = {}
+        # what each row was last given, to skip no-op config updates
+        self._last_cfg: Dict[str, Service] = {}
 
         self.poll_timer = QtCore.QTimer(self)
-        self.poll_timer.setInterval(3000)
+        self.poll_timer.setInterval(2000)
         self.poll_timer.timeout.connect(self.refresh)
 
-    def set_services(self, config: Dict) -> None:
-        services = config.get("services", [])
+        # one pending refresh for bursts of start/stop clicks and results
+        self._refresh_timer = QtCore.QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+    def set_services(self, services: List[Service]) -> None:
         seen_units = set()
         for svc in services:
-            unit = svc.get("unit")
-            if not unit:
-                continue
+            unit = svc.unit
             seen_units.add(unit)
             row = self.rows.get(unit)
             if row is None:
                 row = ServiceRow(self, svc)
                 self.rows[unit] = row
                 self.list_layout.addWidget(row)
-            else:
+            elif self._last_cfg.get(unit) != svc:
                 row.update_config(svc)
+            self._last_cfg[unit] = svc
 
         for unit, row in list(self.rows.items()):
             if unit not in seen_units:
                 row.setParent(None)
                 row.deleteLater()
                 del self.rows[unit]
+                self._last_cfg.pop(unit, None)
 
         self.empty_label.setVisible(not self.rows)
 
+    def _get_button_icons(self, color: QtGui.QColor) -> Tuple[QtGui.QIcon, QtGui.QIcon, QtGui.QIcon, QtGui.QIcon]:
+        key = color.rgba()
+        icons = self._button_icons.get(key)
+        if icons is None:
+            factory = _IconFactory(color)
+            icons = (
+                factory.make_triangle_icon(),
+                factory.make_stop_icon(),
+                factory.make_log_icon(),
+                factory.make_open_icon(),
+            )
+            self._button_icons[key] = icons
+        return icons
+
     def show_at(self, global_pos: QtCore.QPoint) -> None:
-        self.set_services(self.tray.config)
+        self.set_services(self.tray.services)
         self.refresh()
         self.adjustSize()
         screen = QtWidgets.QApplication.screenAt(global_pos) or QtWidgets.QApplication.primaryScreen()
@@ -319,31 +353,26 @@ class ServicesPanel(QtWidgets.QFrame):
         self.activateWindow()
 
     def refresh(self) -> None:
-        services = self.tray.config.get("services", [])
-        if not services:
+        # rows only change in set_services; a poll just pushes statuses
+        if not self.rows:
             self.empty_label.show()
             return
 
-        for svc in services:
-            unit = svc.get("unit")
-            if not unit:
-                continue
-            row = self.rows.get(unit)
-            if row is None:
-                row = ServiceRow(self, svc)
-                self.rows[unit] = row
-                self.list_layout.addWidget(row)
-            row.update_config(svc)
-            row.update_status(self.tray.query_status(unit))
-            self.tray.request_status_update(unit)
-
-        self.empty_label.setVisible(not self.rows)
+        snapshot = self.tray.status_snapshot()
+        for unit, row in self.rows.items():
+            # rows ignore statuses they already show
+            row.update_status(snapshot.get(unit, "unknown"))
+        self.tray.request_status_updates(list(self.rows))
 
     def schedule_refresh(self, delay_ms: int = 800) -> None:
-        QtCore.QTimer.singleShot(delay_ms, self.refresh)
+        timer = self._refresh_timer
+        if not timer.isActive() or timer.remainingTime() > delay_ms:
+            timer.start(delay_ms)
 
     def showEvent(self, event: QtGui.QShowEvent) -> None:
-        self.poll_timer.start()
+        # with pushed state changes the panel only needs the refresh on show
+        if not self.tray.backend.watching:
+            self.poll_timer.start()
         super().showEvent(event)
 
     def hideEvent(self, event: QtGui.QHideEvent) -> None:
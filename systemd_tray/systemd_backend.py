@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import os
+import re
 import subprocess
+import threading
 import time
 from dataclasses import dataclass
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 from PySide6 import QtCore
 
+try:
+    from jeepney import DBusAddress, HeaderFields, MatchRule, new_method_call
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import DBusErrorResponse, unwrap_msg
+except Exception:  # pragma: no cover - D-Bus client optional
+    open_dbus_connection = None
+
 MANAGEABLE_STATES = {
     "enabled",
     "disabled",
@@ -32,31 +43,236 @@ DEFAULT_EXCLUDE_PREFIXES = (
     "app-",
 )
 
+def user_unit_dirs() -> List[str]:
+    """The user manager's unit search path, as listed in systemd.unit(5)."""
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    config_dirs = (os.environ.get("XDG_CONFIG_DIRS") or "/etc/xdg").split(":")
+    data_dirs = (os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(":")
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    runtime_systemd = os.path.join(runtime, "systemd")
+    return [
+        os.path.join(config_home, "systemd", "user.control"),
+        os.path.join(runtime_systemd, "user.control"),
+        os.path.join(runtime_systemd, "transient"),
+        os.path.join(runtime_systemd, "generator.early"),
+        os.path.join(config_home, "systemd", "user"),
+        *(os.path.join(d, "systemd", "user") for d in config_dirs if d),
+        "/etc/systemd/user",
+        os.path.join(runtime_systemd, "user"),
+        "/run/systemd/user",
+        os.path.join(runtime_systemd, "generator"),
+        os.path.join(data_home, "systemd", "user"),
+        *(os.path.join(d, "systemd", "user") for d in data_dirs if d),
+        os.path.join(runtime_systemd, "generator.late"),
+        "/usr/local/lib/systemd/user",
+        "/usr/lib/systemd/user",
+    ]
 
 @dataclass
 class ServiceCandidate:
+    # declared by hand; dataclass(slots=True) needs Python 3.10
+    __slots__ = ("unit", "state", "description", "fragment_path", "hidden")
+
     unit: str
     state: str
     description: str
     fragment_path: Optional[str]
-    hidden: bool = False
+    hidden: bool
+
+def unit_dirs_fingerprint() -> Tuple[int, ...]:
+    # enable/disable only touch the *.wants/ subdirectories, so stat those too
+    stamps: List[int] = []
+    for path in user_unit_dirs():
+        try:
+            stamps.append(os.stat(path).st_mtime_ns)
+            with os.scandir(path) as entries:
+                stamps.extend(
+                    entry.stat().st_mtime_ns
+                    for entry in entries
+                    if entry.is_dir(follow_symlinks=False)
+                )
+        except OSError:
+            stamps.append(0)
+    return tuple(stamps)
+
+def _parse_show_blocks(output: bytes) -> List[Dict[str, str]]:
+    # split on raw bytes; only keys and values get decoded, and never strictly
+    blocks: List[Dict[str, str]] = []
+    for block in output.strip().split(b"\n\n"):
+        props: Dict[str, str] = {}
+        for line in block.splitlines():
+            key, sep, value = line.partition(b"=")
+            if sep:
+                props[key.decode("ascii", "replace")] = value.strip().decode("utf-8", "replace")
+        if props:
+            blocks.append(props)
+    return blocks
 
-def describe_unit(unit: str) -> tuple[str, Optional[str]]:
+def _match_show_blocks(units: List[str], blocks: List[Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    if len(blocks) == len(units):
+        # systemctl show keeps argument order; Id may differ for aliases
+        return dict(zip(units, blocks))
+    wanted = set(units)
+    return {props["Id"]: props for props in blocks if props.get("Id") in wanted}
+
+def describe_units(units: List[str]) -> Dict[str, tuple[str, Optional[str]]]:
+    if not units:
+        return {}
     cp = subprocess.run(
-        ["systemctl", "--user", "show", unit, "--property=Description", "--property=FragmentPath"],
+        [
+            "systemctl", "--user", "show", *units,
+            "--property=Id", "--property=Description", "--property=FragmentPath",
+        ],
         capture_output=True,
-        text=True,
     )
-    description = ""
-    fragment_path: Optional[str] = None
-    if cp.returncode == 0:
-        for line in cp.stdout.splitlines():
-            if line.startswith("Description="):
-                description = line.split("=", 1)[1].strip()
-            elif line.startswith("FragmentPath="):
-                value = line.split("=", 1)[1].strip()
-                fragment_path = value or None
-    return description, fragment_path
+    matched = _match_show_blocks(units, _parse_show_blocks(cp.stdout or b""))
+    return {
+        unit: (props.get("Description", ""), props.get("FragmentPath") or None)
+        for unit, props in matched.items()
+    }
+
+def parse_active_states(units: List[str], output: bytes) -> Dict[str, str]:
+    matched = _match_show_blocks(units, _parse_show_blocks(output))
+    return {unit: props.get("ActiveState") or "unknown" for unit, props in matched.items()}
+
+_UNIT_PATH_PREFIX = "/org/freedesktop/systemd1/unit"
+_JOB_METHODS = {"start": "StartUnit", "stop": "StopUnit", "restart": "RestartUnit"}
+_UNIT_PATH_ESCAPE_RE = re.compile(r"_([0-9a-f]{2})")
+
+def _systemd_manager() -> "DBusAddress":
+    return DBusAddress(
+        "/org/freedesktop/systemd1",
+        bus_name="org.freedesktop.systemd1",
+        interface="org.freedesktop.systemd1.Manager",
+    )
+
+def unit_from_object_path(path: str) -> str:
+    label = path.rsplit("/", 1)[-1]
+    return _UNIT_PATH_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)), label)
+
+class _SystemdBus:
+    """Session-bus connection to the user systemd manager, opened on first use."""
+
+    def __init__(self) -> None:
+        self._conn = None
+        self._lock = threading.Lock()
+        self._manager = _systemd_manager() if open_dbus_connection is not None else None
+
+    def active_states(self, units: List[str], timeout: float) -> Optional[Dict[str, str]]:
+        if self._manager is None:
+            return None
+        msg = new_method_call(self._manager, "ListUnitsByNames", "as", (units,))
+        # pool threads share one connection, so serialize round trips
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = open_dbus_connection(bus="SESSION")
+                reply = self._conn.send_and_get_reply(msg, timeout=timeout)
+                (rows,) = unwrap_msg(reply)
+            except Exception:
+                self._close()
+                return None
+        # (name, description, load, active, sub, followed, path, job id, job type, job path)
+        return {row[0]: row[3] for row in rows}
+
+    def run_action(self, action: str, unit: str, timeout: float) -> Optional[Tuple[bool, str]]:
+        """Run a unit job or daemon reload like systemctl would, waiting for the
+        job to finish; None if the manager could not be reached."""
+        if self._manager is None:
+            return None
+        if action == "daemon-reload":
+            call = new_method_call(self._manager, "Reload")
+        elif action in _JOB_METHODS:
+            call = new_method_call(self._manager, _JOB_METHODS[action], "ss", (unit, "replace"))
+        else:
+            return None
+        rule = MatchRule(
+            type="signal",
+            interface="org.freedesktop.systemd1.Manager",
+            member="JobRemoved",
+            path="/org/freedesktop/systemd1",
+        )
+        deadline = time.monotonic() + timeout
+        # a private connection, so waiting on a job never holds up status queries
+        try:
+            conn = open_dbus_connection(bus="SESSION")
+        except Exception:
+            return None
+        try:
+            try:
+                unwrap_msg(conn.send_and_get_reply(message_bus.AddMatch(rule), timeout=timeout))
+                unwrap_msg(conn.send_and_get_reply(new_method_call(self._manager, "Subscribe"), timeout=timeout))
+            except Exception:
+                return None
+            # filter before queueing the job; its JobRemoved may beat the reply
+            with conn.filter(rule, bufsize=64) as removed:
+                reply = unwrap_msg(conn.send_and_get_reply(call, timeout=timeout))
+                if action == "daemon-reload":
+                    return True, ""
+                (job,) = reply
+                while True:
+                    msg = conn.recv_until_filtered(removed, timeout=max(0.0, deadline - time.monotonic()))
+                    _, path, _, result = msg.body
+                    if path == job:
+                        break
+            if result != "done":
+                return False, f"Job for {unit} finished with result '{result}'"
+            return True, ""
+        except DBusErrorResponse as exc:
+            return False, str(exc.data[0]) if exc.data else str(exc)
+        except TimeoutError:
+            return False, "Command timed out"
+        except Exception as exc:
+            return False, str(exc)
+        finally:
+            conn.close()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+class _UnitStateWatcher(threading.Thread):
+    """Forwards ActiveState changes pushed by the user manager as statusFetched."""
+
+    def __init__(self, backend: "SystemdBackend"):
+        super().__init__(name="systemd-unit-watcher", daemon=True)
+        self.backend = backend
+
+    def run(self) -> None:
+        rule = MatchRule(
+            type="signal",
+            interface="org.freedesktop.DBus.Properties",
+            member="PropertiesChanged",
+            path_namespace=_UNIT_PATH_PREFIX,
+        )
+        try:
+            conn = open_dbus_connection(bus="SESSION")
+            unwrap_msg(conn.send_and_get_reply(message_bus.AddMatch(rule), timeout=5))
+            unwrap_msg(conn.send_and_get_reply(new_method_call(_systemd_manager(), "Subscribe"), timeout=5))
+        except Exception:
+            return
+        self.backend.watching = True
+        try:
+            while True:
+                msg = conn.receive()
+                if not rule.matches(msg):
+                    continue
+                interface, changed, _ = msg.body
+                if interface != "org.freedesktop.systemd1.Unit" or "ActiveState" not in changed:
+                    continue
+                _, state = changed["ActiveState"]
+                unit = unit_from_object_path(msg.header.fields[HeaderFields.path])
+                self.backend.statusFetched.emit(unit, state)
+        except Exception:
+            pass
+        finally:
+            self.backend.watching = False
+            conn.close()
 
 class _SystemctlRunnable(QtCore.QRunnable):
     def __init__(self, backend: "SystemdBackend", action: str, unit: str, args: List[str], timeout: int = 10):
@@ -68,38 +284,145 @@ class _SystemctlRunnable(QtCore.QRunnable):
         self.timeout = timeout
 
     def run(self) -> None:
+        success, message = self._run()
+        if self.action == "daemon-reload":
+            # reloaded unit files may change what list_services reports
+            self.backend._invalidate_services()
+        self.backend.commandFinished.emit(self.unit, self.action, success, message)
+
+    def _run(self) -> Tuple[bool, str]:
+        outcome = self.backend.bus.run_action(self.action, self.unit, self.timeout)
+        if outcome is not None:
+            return outcome
+
         cmd = ["systemctl", "--user", *self.args]
         try:
             cp = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
             stdout = (cp.stdout or "").strip()
             stderr = (cp.stderr or "").strip()
         except subprocess.TimeoutExpired:
-            self.backend.commandFinished.emit(self.unit, self.action, False, "Command timed out")
-            return
+            return False, "Command timed out"
         except Exception as exc:  # pragma: no cover
-            self.backend.commandFinished.emit(self.unit, self.action, False, str(exc))
-            return
+            return False, str(exc)
 
-        if self.action == "status":
-            status = stdout or stderr or "unknown"
-            self.backend.statusFetched.emit(self.unit, status)
-        else:
-            success = cp.returncode == 0
-            message = stdout if success else (stderr or stdout)
-            self.backend.commandFinished.emit(self.unit, self.action, success, message)
+        success = cp.returncode == 0
+        return success, stdout if success else (stderr or stdout)
+
+class _StatusBatchRunnable(QtCore.QRunnable):
+    def __init__(self, backend: "SystemdBackend", units: List[str], timeout: int = 6):
+        super().__init__()
+        self.backend = backend
+        self.units = units
+        self.timeout = timeout
+
+    def run(self) -> None:
+        try:
+            self._run()
+        finally:
+            self.backend._finish_status_requests(self.units)
+
+    def _run(self) -> None:
+        states = self.backend.bus.active_states(self.units, self.timeout) or {}
+        missing = [unit for unit in self.units if unit not in states]
+        if missing:
+            # no D-Bus client, or names the manager reported under another id
+            fetched = self._fetch_with_systemctl(missing)
+            if fetched is None:
+                return
+            states.update(fetched)
+        for unit in self.units:
+            self.backend.statusFetched.emit(unit, states.get(unit, "unknown"))
+
+    def _fetch_with_systemctl(self, units: List[str]) -> Optional[Dict[str, str]]:
+        cmd = ["systemctl", "--user", "show", "--property=Id", "--property=ActiveState", *units]
+        try:
+            cp = subprocess.run(cmd, capture_output=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            for unit in units:
+                self.backend.commandFinished.emit(unit, "status", False, "Command timed out")
+            return None
+        except Exception as exc:  # pragma: no cover
+            for unit in units:
+                self.backend.commandFinished.emit(unit, "status", False, str(exc))
+            return None
+        return parse_active_states(units, cp.stdout or b"")
+
+class _ListServicesRunnable(QtCore.QRunnable):
+    def __init__(self, backend: "SystemdBackend", include_hidden: bool, required_units: Optional[Set[str]], force_refresh: bool):
+        super().__init__()
+        self.backend = backend
+        self.include_hidden = include_hidden
+        self.required_units = required_units
+        self.force_refresh = force_refresh
+
+    def run(self) -> None:
+        try:
+            services = self.backend.list_services(
+                include_hidden=self.include_hidden,
+                required_units=self.required_units,
+                force_refresh=self.force_refresh,
+            )
+        except Exception:  # pragma: no cover
+            services = []
+        self.backend.servicesListed.emit(services)
 
 class SystemdBackend(QtCore.QObject):
     statusFetched = QtCore.Signal(str, str)
     commandFinished = QtCore.Signal(str, str, bool, str)
+    servicesListed = QtCore.Signal(object)
 
     def __init__(self, parent: Optional[QtCore.QObject] = None):
         super().__init__(parent)
         self.pool = QtCore.QThreadPool(self)
-        self._services_cache: Optional[tuple[float, List[ServiceCandidate]]] = None
+        self.bus = _SystemdBus()
+        self.watching = False
+        self._watcher: Optional[_UnitStateWatcher] = None
+        # units with a status query queued or running; cleared by the worker
+        self._in_flight: Set[str] = set()
+        # in-flight units force-requested again after a start/stop; the
+        # running batch may predate the change, so they get re-queued
+        self._requested_again: Set[str] = set()
+        self._in_flight_lock = threading.Lock()
+        # (checked at, listing arguments, unit dir fingerprint, services)
+        self._services_cache: Optional[tuple[float, tuple, Tuple[int, ...], List[ServiceCandidate]]] = None
         self.services_cache_ttl = 3.0
+        # bumped by daemon-reload, so a listing that straddles it isn't kept
+        self._services_generation = 0
 
-    def request_status(self, unit: str) -> None:
-        self._start_task("status", unit, ["is-active", unit], timeout=6)
+    def start_watching(self) -> None:
+        if open_dbus_connection is None or self._watcher is not None:
+            return
+        self._watcher = _UnitStateWatcher(self)
+        self._watcher.start()
+
+    def request_status(self, unit: str, force: bool = False) -> None:
+        self.request_statuses([unit], force)
+
+    def request_statuses(self, units: List[str], force: bool = False) -> None:
+        # plain duplicates of an in-flight query are dropped; force means
+        # the state changed since that query started
+        with self._in_flight_lock:
+            pending = []
+            for unit in dict.fromkeys(units):
+                if unit in self._in_flight:
+                    if force:
+                        self._requested_again.add(unit)
+                else:
+                    pending.append(unit)
+            self._in_flight.update(pending)
+        if not pending:
+            return
+        self.pool.start(_StatusBatchRunnable(self, pending))
+
+    def _finish_status_requests(self, units: List[str]) -> None:
+        with self._in_flight_lock:
+            again = [unit for unit in units if unit in self._requested_again]
+            self._requested_again.difference_update(again)
+            # re-queued units stay in flight for their follow-up batch
+            self._in_flight.difference_update(units)
+            self._in_flight.update(again)
+        if again:
+            self.pool.start(_StatusBatchRunnable(self, again))
 
     def start_unit(self, unit: str) -> None:
         self._start_task("start", unit, ["start", unit])
@@ -117,6 +440,14 @@ class SystemdBackend(QtCore.QObject):
         runnable = _SystemctlRunnable(self, action, unit, args, timeout)
         self.pool.start(runnable)
 
+    def request_services(
+        self,
+        include_hidden: bool = False,
+        required_units: Optional[Set[str]] = None,
+        force_refresh: bool = False,
+    ) -> None:
+        self.pool.start(_ListServicesRunnable(self, include_hidden, required_units, force_refresh))
+
     def list_services(
         self,
         include_hidden: bool = False,
@@ -124,36 +455,59 @@ class SystemdBackend(QtCore.QObject):
         force_refresh: bool = False,
     ) -> List[ServiceCandidate]:
         now = time.monotonic()
-        if not force_refresh and self._services_cache is not None:
-            ts, services = self._services_cache
+        args = (include_hidden, frozenset(required_units or ()))
+        cached = self._services_cache
+        if not force_refresh and cached is not None and cached[1] == args:
+            ts, _, fingerprint, services = cached
             if now - ts < self.services_cache_ttl:
                 return services
+            if unit_dirs_fingerprint() == fingerprint:
+                # no unit file was added, removed, enabled or disabled
+                self._services_cache = (now, args, fingerprint, services)
+                return services
+        generation = self._services_generation
+        fingerprint = unit_dirs_fingerprint()
         services = self.___list_user_services(include_hidden=include_hidden, required_units=required_units)
-        self._services_cache = (now, services)
+        if generation == self._services_generation:
+            self._services_cache = (now, args, fingerprint, services)
         return services
+
+    def _invalidate_services(self) -> None:
+        self._services_generation += 1
+        self._services_cache = None
     
     def ___list_user_services(self, include_hidden: bool = False, required_units: Optional[Set[str]] = None) -> List[ServiceCandidate]:
-        cp = subprocess.run(
+        entries: List[tuple[str, str]] = []
+        # parse lines as systemctl writes them instead of after it exits
+        with subprocess.Popen(
             ["systemctl", "--user", "list-unit-files", "--type=service", "--no-legend", "--no-pager"],
-            capture_output=True,
-            text=True,
-        )
-        if cp.returncode != 0:
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        ) as proc:
+            for line in proc.stdout:
+                # split(None) skips surrounding whitespace and blank lines itself
+                parts = line.split(None, 2)
+                if len(parts) < 2:
+                    continue
+                # only the unit and state columns are ever decoded
+                entries.append((parts[0].decode("utf-8", "replace"), parts[1].decode("ascii", "replace")))
+        if proc.returncode != 0:
             return []
-        candidates: List[ServiceCandidate] = []
-        for line in cp.stdout.splitlines():
-            stripped = line.strip()
-            if not stripped:
-                continue
-            parts = stripped.split()
-            if len(parts) < 2:
-                continue
-            unit, state = parts[0], parts[1]
-            desc, frag = describe_unit(unit)
-            expose = self._should_expose_unit(unit, state, frag)
+
+        # the exposure filter doesn't look at FragmentPath, so decide before
+        # paying for describe_units on units that would be dropped anyway
+        kept: List[tuple[str, str, bool]] = []
+        for unit, state in entries:
+            expose = self._should_expose_unit(unit, state, None)
             must_include = required_units and unit in required_units
             if expose or include_hidden or must_include:
-                candidates.append(ServiceCandidate(unit=unit, state=state, description=desc, fragment_path=frag, hidden=not expose))
+                kept.append((unit, state, expose))
+
+        details = describe_units([unit for unit, _, _ in kept])
+        candidates: List[ServiceCandidate] = []
+        for unit, state, expose in kept:
+            desc, frag = details.get(unit, ("", None))
+            candidates.append(ServiceCandidate(unit=unit, state=state, description=desc, fragment_path=frag, hidden=not expose))
         return candidates
 
     def _should_expose_unit(self, unit: str, state: str, fragment_path: Optional[str]) -> bool:
@@ -163,8 +517,9 @@ class SystemdBackend(QtCore.QObject):
             return False
         if unit.endswith("@autostart.service"):
             return False
-        lowered = unit.lower()
-        for prefix in DEFAULT_EXCLUDE_PREFIXES:
-            if lowered.startswith(prefix):
-                return False
+        # unit names are nearly always lowercase already; only lower() the rest
+        if unit.startswith(DEFAULT_EXCLUDE_PREFIXES) or (
+            not unit.islower() and unit.lower().startswith(DEFAULT_EXCLUDE_PREFIXES)
+        ):
+            return False
         return True